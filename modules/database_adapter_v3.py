@@ -4,6 +4,8 @@
 """
 
 import logging
+import traceback
+from types import MappingProxyType
 import streamlit as st
 from typing import List, Dict, Any, Optional
 from datetime import datetime
@@ -18,6 +20,87 @@ from modules.session_manager import session_manager
 
 logger = logging.getLogger(__name__)
 
+# 新DBキー -> 演習タイプ名（新しいスキーマに合わせたキーマッピング）
+NEW_KEY_TO_TYPE_NAME = MappingProxyType({
+    # 英語読解系 (category_id = 5)
+    'english_reading': 'english_reading_practice',
+    'keyword_generation_english': 'keyword_generation_english',
+    'paper_search_english': 'paper_search_english',
+    
+    # 自由記述系 (category_id = 4)
+    'free_writing': 'free_writing_practice',
+    'keyword_generation_free': 'keyword_generation_free',
+    'paper_search_free': 'paper_search_free',
+    
+    # 採用試験系 (category_id = 1)
+    'prefecture_adoption': 'prefecture_adoption',
+    'keyword_generation_adoption': 'keyword_generation_adoption',
+    'paper_search_adoption': 'paper_search_adoption',
+    
+    # 小論文系 (category_id = 2)
+    'essay_writing': 'essay_practice',
+    'keyword_generation_essay': 'keyword_generation_essay',
+    'paper_search_essay': 'paper_search_essay',
+    
+    # 面接系 (category_id = 3)
+    'interview_prep': 'interview_prep',
+    'keyword_generation_interview': 'keyword_generation_interview',
+    'paper_search_interview': 'paper_search_interview',
+    
+    # 旧形式との互換性
+    'keyword_generation_paper': 'keyword_generation_english',  # デフォルトで英語読解
+    'keyword_generation_freeform': 'keyword_generation_free',  # 自由記述
+    'keyword_generation_general': 'keyword_generation_english',  # デフォルトで英語読解
+    'paper_search': 'paper_search_english',  # デフォルトで英語読解
+    'キーワード生成': 'keyword_generation_english',
+    '論文検索': 'paper_search_english',
+    
+    # 英語読解系の追加マッピング
+    'english_reading_standard': 'english_reading_practice',
+    'english_reading_letter_style': 'english_reading_practice',
+    'english_reading_comment_style': 'english_reading_practice',
+    
+    # 採点系のマッピング
+    'letter_translation_opinion': 'english_reading_practice',
+    'paper_comment_translation_opinion': 'english_reading_practice',
+    '過去問スタイル採点': 'english_reading_practice',
+})
+
+# 旧形式のタイプ名 -> 演習タイプ名
+OLD_NAME_TO_TYPE_NAME = MappingProxyType({
+    # 基本練習タイプ
+    '英語読解': 'english_reading_practice',
+    '自由記述': 'free_writing_practice',
+    'free_writing': 'free_writing_practice',  # 追加：ページで使用される形式
+    '医学知識チェック': 'free_writing_practice',  # 追加：医学知識チェックは自由記述として扱う
+    '県総採用試験': 'prefecture_adoption',
+    '面接準備': 'interview_prep',
+    '小論文練習': 'essay_practice',
+    
+    # キーワード生成・論文検索（用途に応じて振り分け）
+    'キーワード生成・論文検索': 'keyword_generation_english',  # デフォルトで英語読解
+    'キーワード生成': 'keyword_generation_english',  # デフォルトで英語読解
+    '論文検索': 'paper_search_english',  # デフォルトで英語読解
+    
+    # 英語読解系の追加マッピング
+    'english_reading_standard': 'english_reading_practice',
+    'english_reading_letter_style': 'english_reading_practice',
+    'english_reading_comment_style': 'english_reading_practice',
+    '過去問スタイル採点(letter_translation_opinion)': 'english_reading_practice',
+    '過去問スタイル採点(paper_comment_translation_opinion)': 'english_reading_practice',
+    
+    # 採点系のマッピング
+    'letter_translation_opinion': 'english_reading_practice',
+    'paper_comment_translation_opinion': 'english_reading_practice',
+    '過去問スタイル採点': 'english_reading_practice',
+    
+    # キーワード生成・論文検索のマッピング
+    'keyword_generation_paper': 'keyword_generation_english',
+    'keyword_generation_freeform': 'keyword_generation_free',
+    'keyword_generation_general': 'keyword_generation_english',
+    'paper_search': 'paper_search_english',
+})
+
 class DatabaseAdapterV3:
     """
     新しいデータベース設計に対応したアダプタークラス
@@ -28,6 +111,8 @@ class DatabaseAdapterV3:
         self.v3_manager = db_manager_v3
         self.session_mgr = session_manager
         self._current_session = None
+        # 新DBキー -> 演習タイプID（見つかったものだけを保持）
+        self._exercise_type_id_cache: Dict[str, int] = {}
     
     def is_available(self) -> bool:
         """データベースが利用可能かチェック"""
@@ -184,7 +269,6 @@ class DatabaseAdapterV3:
             
         except Exception as e:
             logger.error(f"❌ Error saving practice history: {e}")
-            import traceback
             logger.error(f"Traceback: {traceback.format_exc()}")
             logger.info(f"=== DatabaseAdapterV3.save_practice_history ERROR ===")
             return False
@@ -300,65 +384,18 @@ class DatabaseAdapterV3:
         Returns:
             演習タイプID
         """
+        cached_id = self._exercise_type_id_cache.get(practice_type)
+        if cached_id is not None:
+            return cached_id
+        
         try:
-            # 新しいスキーマに合わせたキーマッピング
-            type_mapping = {
-                # 英語読解系 (category_id = 5)
-                'english_reading': 'english_reading_practice',
-                'keyword_generation_english': 'keyword_generation_english',
-                'paper_search_english': 'paper_search_english',
-                
-                # 自由記述系 (category_id = 4)
-                'free_writing': 'free_writing_practice',
-                'keyword_generation_free': 'keyword_generation_free',
-                'paper_search_free': 'paper_search_free',
-                
-                # 採用試験系 (category_id = 1)
-                'prefecture_adoption': 'prefecture_adoption',
-                'keyword_generation_adoption': 'keyword_generation_adoption',
-                'paper_search_adoption': 'paper_search_adoption',
-                
-                # 小論文系 (category_id = 2)
-                'essay_writing': 'essay_practice',
-                'keyword_generation_essay': 'keyword_generation_essay',
-                'paper_search_essay': 'paper_search_essay',
-                
-                # 面接系 (category_id = 3)
-                'interview_prep': 'interview_prep',
-                'keyword_generation_interview': 'keyword_generation_interview',
-                'paper_search_interview': 'paper_search_interview',
-                
-                # 旧形式との互換性
-                'keyword_generation_paper': 'keyword_generation_english',  # デフォルトで英語読解
-                'keyword_generation_freeform': 'keyword_generation_free',  # 自由記述
-                'keyword_generation_general': 'keyword_generation_english',  # デフォルトで英語読解
-                'paper_search': 'paper_search_english'  # デフォルトで英語読解
-            }
-            
-            # 英語読解系の追加マッピング
-            type_mapping['english_reading_standard'] = 'english_reading_practice'
-            type_mapping['english_reading_letter_style'] = 'english_reading_practice'
-            type_mapping['english_reading_comment_style'] = 'english_reading_practice'
-
-            # 採点系のマッピング
-            type_mapping['letter_translation_opinion'] = 'english_reading_practice'
-            type_mapping['paper_comment_translation_opinion'] = 'english_reading_practice'
-            type_mapping['過去問スタイル採点'] = 'english_reading_practice'
-
-            # キーワード生成・論文検索のマッピング
-            type_mapping['keyword_generation_paper'] = 'keyword_generation_english'
-            type_mapping['keyword_generation_freeform'] = 'keyword_generation_free'
-            type_mapping['keyword_generation_general'] = 'keyword_generation_english'
-            type_mapping['paper_search'] = 'paper_search_english'
-            type_mapping['キーワード生成'] = 'keyword_generation_english'
-            type_mapping['論文検索'] = 'paper_search_english'
-
-            mapped_type = type_mapping.get(practice_type, practice_type)
+            mapped_type = NEW_KEY_TO_TYPE_NAME.get(practice_type, practice_type)
             
             # 演習タイプ一覧から検索
             exercise_types = self.v3_manager.get_exercise_types()
             for exercise_type in exercise_types:
                 if exercise_type.type_name == mapped_type:
+                    self._exercise_type_id_cache[practice_type] = exercise_type.exercise_type_id
                     return exercise_type.exercise_type_id
             
             logger.warning(f"Exercise type not found: {practice_type}")
@@ -379,45 +416,8 @@ class DatabaseAdapterV3:
             演習タイプID
         """
         try:
-            # 旧形式から新形式へのマッピング
-            old_to_new_mapping = {
-                # 基本練習タイプ
-                '英語読解': 'english_reading_practice',
-                '自由記述': 'free_writing_practice',
-                'free_writing': 'free_writing_practice',  # 追加：ページで使用される形式
-                '医学知識チェック': 'free_writing_practice',  # 追加：医学知識チェックは自由記述として扱う
-                '県総採用試験': 'prefecture_adoption',
-                '面接準備': 'interview_prep',
-                '小論文練習': 'essay_practice',
-                
-                # キーワード生成・論文検索（用途に応じて振り分け）
-                'キーワード生成・論文検索': 'keyword_generation_english',  # デフォルトで英語読解
-                'キーワード生成': 'keyword_generation_english',  # デフォルトで英語読解
-                '論文検索': 'paper_search_english',  # デフォルトで英語読解
-                
-                # 英語読解系の追加マッピング
-                'english_reading_standard': 'english_reading_practice',
-                'english_reading_letter_style': 'english_reading_practice',
-                'english_reading_comment_style': 'english_reading_practice',
-                '過去問スタイル採点(letter_translation_opinion)': 'english_reading_practice',
-                '過去問スタイル採点(paper_comment_translation_opinion)': 'english_reading_practice',
-                
-                # 採点系のマッピング
-                'letter_translation_opinion': 'english_reading_practice',
-                'paper_comment_translation_opinion': 'english_reading_practice',
-                '過去問スタイル採点': 'english_reading_practice',
-                
-                # キーワード生成・論文検索のマッピング
-                'keyword_generation_paper': 'keyword_generation_english',
-                'keyword_generation_freeform': 'keyword_generation_free',
-                'keyword_generation_general': 'keyword_generation_english',
-                'paper_search': 'paper_search_english',
-                'キーワード生成': 'keyword_generation_english',
-                '論文検索': 'paper_search_english',
-            }
-            
             # マッピングを適用
-            new_type_name = old_to_new_mapping.get(type_name, type_name)
+            new_type_name = OLD_NAME_TO_TYPE_NAME.get(type_name, type_name)
             
             # 演習タイプ一覧から検索
             exercise_types = self.v3_manager.get_exercise_types()
@@ -648,14 +648,20 @@ class DatabaseAdapterV3:
     
     def get_database_status(self) -> Dict[str, Any]:
         """データベースの状態を取得"""
+        status, _ = self._collect_database_status()
+        return status
+    
+    def _collect_database_status(self) -> tuple:
+        """状態情報と取得した演習タイプの一覧を返す（接続確認は1回だけ行う）"""
         try:
+            available = self.is_available()
             status = {
-                'available': self.is_available(),
-                'v3_manager_available': self.v3_manager.is_available() if self.v3_manager else False,
+                'available': available,
                 'session_manager_available': self.session_mgr is not None
             }
+            exercise_types = []
             
-            if self.is_available():
+            if available:
                 # 接続テスト
                 try:
                     exercise_types = self.v3_manager.get_exercise_types()
@@ -664,11 +670,33 @@ class DatabaseAdapterV3:
                 except Exception as e:
                     status['connection_test'] = f'error: {str(e)}'
             
-            return status
+            return status, exercise_types
             
         except Exception as e:
             logger.error(f"Error getting database status: {e}")
-            return {'available': False, 'error': str(e)}
+            return {'available': False, 'error': str(e)}, []
+    
+    def healthcheck(self, sample_limit: int = 5) -> Dict[str, Any]:
+        """
+        診断ページ向けのヘルスチェック
+        
+        get_database_statusと同じ状態情報に、演習タイプのサンプルを加えて返す
+        
+        Args:
+            sample_limit: サンプルとして返す演習タイプの件数
+            
+        Returns:
+            {'ok': 利用可否, 'sample': 演習タイプのサンプル, 'status': 状態情報}
+        """
+        status, exercise_types = self._collect_database_status()
+        sample = [
+            {
+                'exercise_type_id': et.exercise_type_id,
+                'display_name': et.display_name
+            }
+            for et in exercise_types[:sample_limit]
+        ]
+        return {'ok': status['available'], 'sample': sample, 'status': status}
     
     def export_history(self, practice_type: Optional[str] = None) -> str:
         """履歴をエクスポート"""
@@ -710,6 +738,14 @@ class DatabaseAdapterV3:
             logger.error(f"Error getting user history: {e}")
             return []
     
+    def count_user_history(self) -> int:
+        """全ユーザー履歴の件数を取得（履歴本体は取得しない）"""
+        try:
+            return self.v3_manager.count_user_history()
+        except Exception as e:
+            logger.error(f"Error counting user history: {e}")
+            return 0
+    
     def analyze_user_history(self) -> Dict[str, Any]:
         """ユーザー履歴を分析"""
         try:
@@ -448,6 +448,26 @@ class HistoryManagerV3:
             logger.error(f"Error getting user exercise history: {e}")
             return []
     
+    def count_user_exercise_history(self, user_id: str, exercise_type_id: int = None) -> int:
+        """ユーザーの演習履歴件数を取得（行データは取得せず件数のみ）"""
+        try:
+            if user_id.startswith('temp_'):
+                return 0
+            
+            query = self.client.table('exercise_sessions').select(
+                'session_id', count='exact', head=True
+            ).eq('user_id', user_id)
+            
+            if exercise_type_id:
+                query = query.eq('exercise_type_id', exercise_type_id)
+            
+            result = query.execute()
+            return result.count or 0
+            
+        except Exception as e:
+            logger.error(f"Error counting user exercise history: {e}")
+            return 0
+    
     def _get_session_inputs_batch(self, session_ids: List[str]) -> Dict[str, List[Dict]]:
         """セッション入力データを一括取得"""
         try:
@@ -715,8 +735,9 @@ class DatabaseManagerV3:
                 if cache_age.total_seconds() < 300:  # 5分間キャッシュ
                     return self._exercise_types_cache
             
-            if not self.is_available():
-                logger.error("Database not available")
+            # クエリ自体が接続確認になるため、is_available()による事前の確認は行わない
+            if self.client is None:
+                logger.error("Supabase client is None")
                 return []
             
             result = self.client.table('exercise_types').select(
@@ -832,6 +853,40 @@ class DatabaseManagerV3:
             logger.error(f"Error getting user history: {e}")
             return []
     
+    def count_user_history(self, exercise_type_id: int = None) -> int:
+        """ユーザーの履歴件数を取得"""
+        try:
+            if not self.is_available():
+                logger.error("Database not available")
+                return 0
+            
+            user_id = self.get_current_user_id()
+            return self.history_manager.count_user_exercise_history(user_id, exercise_type_id)
+            
+        except Exception as e:
+            logger.error(f"Error counting user history: {e}")
+            return 0
+
+    def delete_user_history_by_type(self, exercise_type_id: int) -> int:
+        """ユーザーの指定演習タイプの履歴を削除（入力・採点・フィードバックはCASCADEで削除）"""
+        try:
+            if not self.is_available():
+                logger.error("Database not available")
+                return 0
+
+            user_id = self.get_current_user_id()
+            if user_id.startswith('temp_'):
+                return 0
+
+            result = self.client.table('exercise_sessions').delete().eq(
+                'user_id', user_id
+            ).eq('exercise_type_id', exercise_type_id).execute()
+            return len(result.data) if result.data else 0
+
+        except Exception as e:
+            logger.error(f"Error deleting user history by type: {e}")
+            return 0
+
     def get_keyword_history(self, exercise_type_id: int = None, limit: int = 50) -> List[Dict[str, Any]]:
         """キーワード生成履歴を取得"""
         try:
@@ -9,6 +9,7 @@ import re
 import random
 import json
 import logging
+import traceback
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -1397,7 +1398,6 @@ def save_paper_search_keyword(keyword: str, category: str = "", purpose: str = "
     except Exception as e:
         print(f"論文検索キーワード保存エラー: {e}")
         print(f"エラータイプ: {type(e).__name__}")
-        import traceback
         print(f"スタックトレース: {traceback.format_exc()}")
         logger.error(f"論文検索キーワード保存エラー: {e}")
         logger.error(f"エラータイプ: {type(e).__name__}")
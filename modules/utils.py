@@ -11,6 +11,7 @@ import random
 import uuid
 from typing import Dict, List, Optional, Tuple, Any, Union
 import logging
+import traceback
 
 logger = logging.getLogger(__name__)
 
@@ -326,7 +327,6 @@ def save_history(data: Dict[str, Any]) -> Optional[str]:
         
     except Exception as e:
         logger.error(f"❌ Error in save_history: {e}")
-        import traceback
         logger.error(f"Traceback: {traceback.format_exc()}")
         
         # エラー時のフォールバック
@@ -5,6 +5,7 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import json
 import os
+import traceback
 from pathlib import Path
 
 # 新しいデータベースシステムのインポート
@@ -562,7 +563,6 @@ def load_and_process_history():
         
     except Exception as e:
         st.error(f"履歴の読み込みでエラーが発生しました: {e}")
-        import traceback
         st.error(traceback.format_exc())
         return None, pd.DataFrame(), pd.DataFrame()
 
@@ -4,10 +4,50 @@ Supabase接続診断ページ
 
 import streamlit as st
 import os
+import tracemalloc
 from datetime import datetime
 
 st.set_page_config(page_title="Supabase診断", page_icon="🔍")
 
+# 疎通確認の結果は接続情報の組み合わせごとに保持されるため、件数に上限を設ける
+PROBE_MAX_ENTRIES = 4
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_supabase_secrets():
+    """Streamlit SecretsからSupabase接続情報を取得（再実行ごとの再解決を避ける）"""
+    return st.secrets.get("SUPABASE_URL"), st.secrets.get("SUPABASE_ANON_KEY")
+
+@st.cache_data(ttl=30, max_entries=PROBE_MAX_ENTRIES, show_spinner=False)
+def probe_supabase(supabase_url: str, supabase_key: str):
+    """Secretsの接続情報で実際にクエリを発行して疎通を確認（クライアントは保持しない）"""
+    from supabase import create_client
+    client = create_client(supabase_url, supabase_key)
+    response = client.table('exercise_types').select('exercise_type_id').limit(1).execute()
+    return len(response.data or [])
+
+@st.cache_data(ttl=30, show_spinner=False)
+def run_adapter_healthcheck():
+    """DatabaseAdapterのヘルスチェック（連続した再読み込みでは結果を再利用）"""
+    # アダプターはセッションごとの情報を持つため共有せず、その都度生成する（初回利用時にのみモジュールを読み込む）
+    from modules.database_adapter_v3 import DatabaseAdapterV3
+    return DatabaseAdapterV3().healthcheck()
+
+# 環境変数は1回だけ読み込み、サマリー表示用の文字列もここで組み立てておく
+env_supabase_url = os.environ.get('SUPABASE_URL', 'NOT SET')
+env_supabase_key = os.environ.get('SUPABASE_ANON_KEY', 'NOT SET')
+env_display = (
+    "**環境変数:**\n"
+    f"- SUPABASE_URL: {env_supabase_url[:30]}...\n"
+    f"- SUPABASE_ANON_KEY: {env_supabase_key[:20]}..."
+)
+
+# キャッシュの手動クリア（このページのキャッシュのみ破棄し、他ページのキャッシュには触れない）
+if st.sidebar.button("🧹 キャッシュをクリア", help="このページの診断結果のキャッシュを破棄します"):
+    load_supabase_secrets.clear()
+    probe_supabase.clear()
+    run_adapter_healthcheck.clear()
+    st.sidebar.success("キャッシュをクリアしました")
+
 st.title("🔍 Supabase接続診断")
 st.markdown("自由記述ページで「ローカルファイル使用」と表示される原因を診断します。")
 
@@ -17,8 +57,7 @@ st.header("📋 診断結果")
 # 1. Streamlit Secrets確認
 st.subheader("1. Streamlit Secrets確認")
 try:
-    supabase_url = st.secrets.get("SUPABASE_URL")
-    supabase_key = st.secrets.get("SUPABASE_ANON_KEY")
+    supabase_url, supabase_key = load_supabase_secrets()
     
     if supabase_url and supabase_key:
         st.success("✅ Streamlit Secrets: 正常に設定されています")
@@ -37,32 +76,16 @@ except Exception as e:
 # 2. Supabaseライブラリ確認
 st.subheader("2. Supabaseライブラリ確認")
 try:
-    from supabase import create_client
+    import supabase
     st.success("✅ supabase-py ライブラリ: 正常にインポートされています")
     
     # 3. 接続テスト
     st.subheader("3. Supabase接続テスト")
     if supabase_url and supabase_key:
         try:
-            client = create_client(supabase_url, supabase_key)
-            st.success("✅ Supabaseクライアント: 正常に作成されました")
+            row_count = probe_supabase(supabase_url, supabase_key)
+            st.success(f"✅ Supabase接続: exercise_typesへのクエリに成功しました（{row_count}件取得）")
             
-            # 4. データベーステスト
-            st.subheader("4. データベースアクセステスト")
-            try:
-                # exercise_typesテーブルのテスト（新スキーマ）
-                result = client.table('exercise_types').select('exercise_type_id, display_name').limit(5).execute()
-                st.success(f"✅ exercise_types テーブル: 正常にアクセスできます ({len(result.data)}件取得)")
-                
-                # 取得したデータを表示
-                if result.data:
-                    st.write("**取得されたexercise_types:**")
-                    for item in result.data:
-                        st.write(f"- ID: {item['exercise_type_id']}, 名前: {item['display_name']}")
-                
-            except Exception as e:
-                st.error(f"❌ データベースアクセスエラー: {e}")
-                
         except Exception as e:
             st.error(f"❌ Supabase接続エラー: {e}")
             
@@ -72,50 +95,65 @@ try:
 except ImportError as e:
     st.error(f"❌ supabase-py インポートエラー: {e}")
 
-# 6. DatabaseAdapter診断
-st.subheader("6. DatabaseAdapter診断")
-try:
-    from modules.database_adapter_v3 import DatabaseAdapterV3
-    
-    db_adapter = DatabaseAdapterV3()
-    is_available = db_adapter.is_available()
-    
-    if is_available:
-        st.success("✅ DatabaseAdapter: 正常に動作しています")
-        
-        # 状態情報取得
+# 4. DatabaseAdapter診断
+st.subheader("4. DatabaseAdapter診断")
+with st.expander("DatabaseAdapter診断", expanded=False):
+    # expanderの中身は閉じていても実行されるため、チェック時のみモジュールを読み込む
+    if st.checkbox("DatabaseAdapter診断を実行する", value=False):
         try:
-            status = db_adapter.get_database_status()
-            st.write("**データベース状態:**")
-            for key, value in status.items():
-                st.write(f"- {key}: {value}")
+            health = run_adapter_healthcheck()
+            
+            if health['ok']:
+                st.success("✅ DatabaseAdapter: 正常に動作しています")
+                
+                # 取得したデータを表示
+                if health['sample']:
+                    st.markdown("**取得されたexercise_types:**\n" + "\n".join(
+                        f"- ID: {item['exercise_type_id']}, 名前: {item['display_name']}"
+                        for item in health['sample']
+                    ))
+                
+                st.markdown("**データベース状態:**\n" + "\n".join(
+                    f"- {key}: {value}" for key, value in health['status'].items()
+                ))
+                    
+            else:
+                st.error("❌ DatabaseAdapter: 利用不可状態です")
+                st.write("これが「ローカルファイル使用」と表示される原因です。")
                 
         except Exception as e:
-            st.error(f"❌ DatabaseAdapter状態取得エラー: {e}")
-            
+            st.error(f"❌ DatabaseAdapterインポートエラー: {e}")
     else:
-        st.error("❌ DatabaseAdapter: 利用不可状態です")
-        st.write("これが「ローカルファイル使用」と表示される原因です。")
-        
-except Exception as e:
-    st.error(f"❌ DatabaseAdapterインポートエラー: {e}")
+        st.caption("チェックするとDatabaseAdapterを読み込んで接続状態を確認します。")
+
+# 5. キャッシュメモリ使用状況
+st.subheader("5. キャッシュメモリ使用状況")
+# tracemallocはサーバープロセス全体で共有されるため、開始・停止はどのセッションからでも行える
+if tracemalloc.is_tracing():
+    if st.button("⏹️ 計測を停止", help="計測は全セッション共通です。確認が終わったら停止してください"):
+        tracemalloc.stop()
+        st.rerun()
+    
+    snapshot = tracemalloc.take_snapshot()
+    top_stats = snapshot.statistics('filename')[:10]
+    current, peak = tracemalloc.get_traced_memory()
+    st.write(f"**追跡中のメモリ**: {current / 1024:.1f} KB（ピーク: {peak / 1024:.1f} KB）")
+    st.table([
+        {'file': stat.traceback[0].filename, 'size_kb': round(stat.size / 1024, 1), 'count': stat.count}
+        for stat in top_stats
+    ])
+    st.caption("ページを操作した後に再度表示すると、キャッシュを含む割り当て状況が確認できます。")
+elif st.button("▶️ 計測を開始", help="計測中は割り当てごとに追跡が入るため、サーバー全体の処理が遅くなります"):
+    tracemalloc.start(10)
+    st.rerun()
+else:
+    st.caption("tracemallocでメモリ使用状況を計測します（現在は停止中）。")
 
 # 診断サマリー
 st.header("📊 診断サマリー")
 
 # 環境変数確認
-env_vars = []
-try:
-    env_vars = [
-        f"SUPABASE_URL: {os.environ.get('SUPABASE_URL', 'NOT SET')[:30]}...",
-        f"SUPABASE_ANON_KEY: {os.environ.get('SUPABASE_ANON_KEY', 'NOT SET')[:20]}..."
-    ]
-except:
-    env_vars = ["環境変数確認エラー"]
-
-st.write("**環境変数:**")
-for var in env_vars:
-    st.write(f"- {var}")
+st.markdown(env_display)
 
 # 推奨アクション
 st.header("🔧 推奨アクション")
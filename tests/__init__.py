@@ -5,6 +5,7 @@
 - test_imports.py: 基本的なインポートテスト
 - test_database_adapter.py: DatabaseAdapterの新機能テスト  
 - test_paper_finder.py: paper_finder.pyの履歴機能テスト
+- test_db_refactor.py: 統合テストのpytest版（pytest-xdistで並列実行可能）
 - test_practice_types.py: 練習タイプマッピングテスト
 """
 
@@ -0,0 +1,31 @@
+"""
+pytest共通フィクスチャ
+
+DBアダプター・マネージャーはテストセッション全体で1つずつ共有します。
+マネージャーはアプリ本体と同じモジュールのインスタンスを使い、Supabaseクライアントを重複して生成しません。
+（pytest-xdist使用時はワーカーごとに1つ）
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# プロジェクトルートをPythonのパスに追加（各テストファイルでは行わない）
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+@pytest.fixture(scope="session")
+def db_adapter():
+    """セッション内で共有するDatabaseAdapterV3"""
+    from modules.database_adapter_v3 import DatabaseAdapterV3
+    return DatabaseAdapterV3()
+
+
+@pytest.fixture(scope="session")
+def db_manager():
+    """セッション内で共有するDatabaseManagerV3（モジュールのインスタンスを再利用）"""
+    from modules.database_v3 import db_manager_v3
+    return db_manager_v3
@@ -5,9 +5,13 @@
 全てのテストを一括実行し、結果をまとめて表示します。
 """
 
+import io
 import sys
 import os
 import time
+import importlib.util
+import py_compile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # プロジェクトルートをPythonのパスに追加
@@ -15,58 +19,173 @@ project_root = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(project_root)
 sys.path.insert(0, parent_dir)
 
+# TEST_VERBOSE=0 で成功時の詳細・見出しの表示を省略（失敗とサマリーは常に表示）
+VERBOSE = os.environ.get("TEST_VERBOSE", "1") != "0"
+
+# テスト対象モジュールを1回だけインポート（失敗した場合は各テストでエラーとして報告）
+try:
+    from modules.database_adapter_v3 import DatabaseAdapterV3
+    from modules.database_v3 import db_manager_v3
+    from modules.paper_finder import get_keyword_history, clear_keyword_history
+    from modules.session_manager import StreamlitSessionManager
+    IMPORT_ERROR = None
+except Exception as e:
+    IMPORT_ERROR = e
+
+def _require_imports():
+    """モジュールのインポートに失敗していればその例外を送出"""
+    if IMPORT_ERROR is not None:
+        raise IMPORT_ERROR
+
+# テスト間で共有するDBアダプター（テストごとの再生成・再接続を避ける）
+_shared = {"adapter": None}
+
+def get_adapter():
+    """共有のDatabaseAdapterV3を取得（初回呼び出し時のみ生成）"""
+    _require_imports()
+    if _shared["adapter"] is None:
+        _shared["adapter"] = DatabaseAdapterV3()
+    return _shared["adapter"]
+
+def get_db_v3():
+    """共有のDatabaseManagerV3を取得（アダプターと同じモジュールのインスタンスを使い、クライアントを再生成しない）"""
+    _require_imports()
+    return db_manager_v3
+
+# 新機能として存在を確認するメソッド
+ADAPTER_METHODS = frozenset({'get_practice_history_by_type', 'delete_practice_history_by_type'})
+MANAGER_METHODS = frozenset({'delete_user_history_by_type'})
+
+# サマリーに表示するテスト名
+TEST_NAMES = {
+    'import_test': '1. 基本インポートテスト',
+    'adapter_test': '2. DatabaseAdapter新機能テスト',
+    'paper_finder_test': '3. paper_finder履歴機能テスト',
+    'integration_test': '4. 統合動作テスト',
+    'syntax_test': '5. ページファイル構文チェック'
+}
+
+def _has_all(obj, names):
+    """objが指定された属性をすべて持つか確認"""
+    return names.issubset(dir(obj))
+
+# 構文チェック対象のページファイル
+PAGES_TO_CHECK = (
+    "pages/01_県総_採用試験.py",
+    "pages/02_小論文.py",
+    "pages/03_面接.py",
+    "pages/05_英語読解.py",
+)
+
+# 構文チェック済みpycのキャッシュ先（変更のないページは再コンパイルしない）
+PYC_CACHE_DIR = os.path.join(parent_dir, ".pytest_cache", "pyc")
+
+def _is_pyc_fresh(page_file, cfile):
+    """キャッシュ済みpycのヘッダーが元ファイルのmtime・サイズと一致するか確認"""
+    try:
+        source_stat = os.stat(page_file)
+        with open(cfile, 'rb') as f:
+            header = f.read(16)
+    except OSError:
+        return False
+    
+    return (
+        len(header) == 16
+        and header[:4] == importlib.util.MAGIC_NUMBER
+        and int.from_bytes(header[4:8], 'little') == 0  # タイムスタンプ方式
+        and int.from_bytes(header[8:12], 'little') == int(source_stat.st_mtime) & 0xFFFFFFFF
+        and int.from_bytes(header[12:16], 'little') == source_stat.st_size & 0xFFFFFFFF
+    )
+
+def _check_page_syntax(page_file):
+    """ページファイルの構文をチェックし (ファイル名, 結果, 例外) を返す"""
+    try:
+        cfile = os.path.join(PYC_CACHE_DIR, os.path.basename(page_file) + "c")
+        if not _is_pyc_fresh(page_file, cfile):
+            py_compile.compile(
+                page_file,
+                cfile=cfile,
+                doraise=True,
+                invalidation_mode=py_compile.PycInvalidationMode.TIMESTAMP
+            )
+        return page_file, 'ok', None
+    except py_compile.PyCompileError as e:
+        return page_file, 'syntax_error', e
+    except Exception as e:
+        return page_file, 'error', e
+
 def run_test_suite():
     """全テストスイートを実行"""
     
-    print("🚀 新DB対応リファクタリング - 統合テストスイート")
-    print("=" * 80)
-    print(f"実行開始時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("=" * 80)
+    # 出力はバッファにまとめ、テストの区切りごとに書き出す
+    out = io.StringIO()
+    try:
+        return _run_tests(out)
+    finally:
+        _flush(out)
+
+def _flush(out):
+    """バッファの内容を標準出力へ書き出して空にする（応答のない呼び出しでも直前の結果は表示される）"""
+    sys.stdout.write(out.getvalue())
+    sys.stdout.flush()
+    out.seek(0)
+    out.truncate()
+
+def _run_tests(out):
+    """各テストを実行し、結果の表示をoutへ書き込む"""
+    
+    # 開始時刻は1回だけ取得し、表示とテストデータのタイムスタンプで共有する
+    started_at = datetime.now()
     
-    test_results = {}
+    if VERBOSE:
+        print("🚀 新DB対応リファクタリング - 統合テストスイート", file=out)
+        print("=" * 80, file=out)
+        print(f"実行開始時刻: {started_at:%Y-%m-%d %H:%M:%S}", file=out)
+        print("=" * 80, file=out)
+    
+    # (テストキー, 成否, 結果表示, 経過ナノ秒) のリスト
+    test_results = []
     
     # テスト1: 基本インポートテスト
-    print("\n📋 テスト1: 基本インポートテスト")
-    print("-" * 50)
+    if VERBOSE:
+        print("\n📋 テスト1: 基本インポートテスト", file=out)
+        print("-" * 50, file=out)
+    _flush(out)
     try:
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
-        from modules.database_adapter_v3 import DatabaseAdapterV3
-        from modules.database_v3 import DatabaseManagerV3
-        from modules.paper_finder import get_keyword_history, clear_keyword_history
-        from modules.session_manager import StreamlitSessionManager
+        _require_imports()
         
-        db = DatabaseAdapterV3()
-        db_v2 = DatabaseManagerV3()
+        db = get_adapter()
+        db_v2 = get_db_v3()
         
         # 新機能存在確認
-        adapter_methods = [
-            hasattr(db, 'get_practice_history_by_type'),
-            hasattr(db, 'delete_practice_history_by_type'),
-            hasattr(db_v2, 'delete_user_history_by_type')
-        ]
+        methods_exist = _has_all(db, ADAPTER_METHODS) and _has_all(db_v2, MANAGER_METHODS)
         
-        elapsed = time.time() - start_time
+        elapsed_ns = time.perf_counter_ns() - start_ns
         
-        if all(adapter_methods):
-            test_results['import_test'] = {'status': '✅ 成功', 'time': f'{elapsed:.2f}s'}
-            print("✅ 基本インポートテスト成功")
+        if methods_exist:
+            test_results.append(('import_test', True, '✅ 成功', elapsed_ns))
+            if VERBOSE:
+                print("✅ 基本インポートテスト成功", file=out)
         else:
-            test_results['import_test'] = {'status': '❌ 失敗', 'time': f'{elapsed:.2f}s'}
-            print("❌ 基本インポートテスト失敗")
+            test_results.append(('import_test', False, '❌ 失敗', elapsed_ns))
+            print("❌ 基本インポートテスト失敗", file=out)
             
     except Exception as e:
-        test_results['import_test'] = {'status': f'❌ エラー: {e}', 'time': 'N/A'}
-        print(f"❌ 基本インポートテストエラー: {e}")
+        test_results.append(('import_test', False, f'❌ エラー: {e}', None))
+        print(f"❌ 基本インポートテストエラー: {e}", file=out)
     
     # テスト2: DatabaseAdapter新機能テスト
-    print("\n📋 テスト2: DatabaseAdapter新機能テスト")
-    print("-" * 50)
+    if VERBOSE:
+        print("\n📋 テスト2: DatabaseAdapter新機能テスト", file=out)
+        print("-" * 50, file=out)
+    _flush(out)
     try:
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         # 新スキーマ対応テスト
-        db = DatabaseAdapterV3()
+        db = get_adapter()
         success_count = 0
         
         # 基本機能テスト
@@ -74,44 +193,49 @@ def run_test_suite():
             history = db.get_user_history()
             if isinstance(history, list):
                 success_count += 1
-                print("✅ get_user_history 動作確認")
+                if VERBOSE:
+                    print("✅ get_user_history 動作確認", file=out)
         except Exception as e:
-            print(f"❌ get_user_history エラー: {e}")
+            print(f"❌ get_user_history エラー: {e}", file=out)
         
         try:
             result = db.save_practice_history({
                 "type": "test",
                 "content": "テストデータ",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": started_at.isoformat()
             })
             if result:
                 success_count += 1
-                print("✅ save_practice_history 動作確認")
+                if VERBOSE:
+                    print("✅ save_practice_history 動作確認", file=out)
         except Exception as e:
-            print(f"❌ save_practice_history エラー: {e}")
+            print(f"❌ save_practice_history エラー: {e}", file=out)
         
         new_functions_work = success_count >= 1
         
-        elapsed = time.time() - start_time
+        elapsed_ns = time.perf_counter_ns() - start_ns
         
         if success_count >= 1 and new_functions_work:
-            test_results['adapter_test'] = {'status': f'✅ 成功 ({success_count}/2)', 'time': f'{elapsed:.2f}s'}
-            print(f"✅ DatabaseAdapter新機能テスト成功 ({success_count}/2)")
+            test_results.append(('adapter_test', True, f'✅ 成功 ({success_count}/2)', elapsed_ns))
+            if VERBOSE:
+                print(f"✅ DatabaseAdapter新機能テスト成功 ({success_count}/2)", file=out)
         else:
-            test_results['adapter_test'] = {'status': f'⚠️ 部分成功 ({success_count}/2)', 'time': f'{elapsed:.2f}s'}
-            print(f"⚠️ DatabaseAdapter新機能テスト部分成功 ({success_count}/2)")
+            test_results.append(('adapter_test', False, f'⚠️ 部分成功 ({success_count}/2)', elapsed_ns))
+            print(f"⚠️ DatabaseAdapter新機能テスト部分成功 ({success_count}/2)", file=out)
             
     except Exception as e:
-        test_results['adapter_test'] = {'status': f'❌ エラー: {e}', 'time': 'N/A'}
-        print(f"❌ DatabaseAdapter新機能テストエラー: {e}")
+        test_results.append(('adapter_test', False, f'❌ エラー: {e}', None))
+        print(f"❌ DatabaseAdapter新機能テストエラー: {e}", file=out)
     
     # テスト3: paper_finder履歴機能テスト
-    print("\n📋 テスト3: paper_finder履歴機能テスト")
-    print("-" * 50)
+    if VERBOSE:
+        print("\n📋 テスト3: paper_finder履歴機能テスト", file=out)
+        print("-" * 50, file=out)
+    _flush(out)
     try:
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
-        from modules.paper_finder import get_keyword_history, clear_keyword_history
+        _require_imports()
         
         # 履歴取得テスト
         initial_history = get_keyword_history()
@@ -125,138 +249,129 @@ def run_test_suite():
         after_delete_history = get_keyword_history()
         after_success = isinstance(after_delete_history, list)
         
-        elapsed = time.time() - start_time
+        elapsed_ns = time.perf_counter_ns() - start_ns
         
         if get_success and delete_success and after_success:
-            test_results['paper_finder_test'] = {'status': '✅ 成功', 'time': f'{elapsed:.2f}s'}
-            print("✅ paper_finder履歴機能テスト成功")
+            test_results.append(('paper_finder_test', True, '✅ 成功', elapsed_ns))
+            if VERBOSE:
+                print("✅ paper_finder履歴機能テスト成功", file=out)
         else:
-            test_results['paper_finder_test'] = {'status': '❌ 失敗', 'time': f'{elapsed:.2f}s'}
-            print("❌ paper_finder履歴機能テスト失敗")
+            test_results.append(('paper_finder_test', False, '❌ 失敗', elapsed_ns))
+            print("❌ paper_finder履歴機能テスト失敗", file=out)
             
     except Exception as e:
-        test_results['paper_finder_test'] = {'status': f'❌ エラー: {e}', 'time': 'N/A'}
-        print(f"❌ paper_finder履歴機能テストエラー: {e}")
+        test_results.append(('paper_finder_test', False, f'❌ エラー: {e}', None))
+        print(f"❌ paper_finder履歴機能テストエラー: {e}", file=out)
     
     # テスト4: 統合動作テスト
-    print("\n📋 テスト4: 統合動作テスト")
-    print("-" * 50)
+    if VERBOSE:
+        print("\n📋 テスト4: 統合動作テスト", file=out)
+        print("-" * 50, file=out)
+    _flush(out)
     try:
-        start_time = time.time()
-        
-        from modules.database_adapter_v3 import DatabaseAdapterV3
-        from modules.paper_finder import get_keyword_history
+        start_ns = time.perf_counter_ns()
         
-        db = DatabaseAdapterV3()
+        _require_imports()
+        db = get_adapter()
         
         # 新スキーマ対応の統合テスト
         db_records = 0
         try:
-            history = db.get_user_history()
-            db_records = len(history)
-            print(f"✅ DatabaseAdapter: {db_records}件の履歴を取得")
+            db_records = db.count_user_history()
+            if VERBOSE:
+                print(f"✅ DatabaseAdapter: {db_records}件の履歴を確認", file=out)
         except Exception as e:
-            print(f"❌ DatabaseAdapter エラー: {e}")
+            print(f"❌ DatabaseAdapter エラー: {e}", file=out)
         
         # paper_finder経由での取得
         pf_records = get_keyword_history()
         pf_count = len(pf_records)
-        print(f"✅ paper_finder: {pf_count}件の履歴を取得")
+        if VERBOSE:
+            print(f"✅ paper_finder: {pf_count}件の履歴を取得", file=out)
         
-        elapsed = time.time() - start_time
+        elapsed_ns = time.perf_counter_ns() - start_ns
         
         # 結果の確認
         if db_records >= 0 and pf_count >= 0:
-            test_results['integration_test'] = {'status': f'✅ 動作確認済み (DB:{db_records}件, PF:{pf_count}件)', 'time': f'{elapsed:.2f}s'}
-            print(f"✅ 統合動作テスト成功 - 動作確認済み (DB:{db_records}件, PF:{pf_count}件)")
+            test_results.append(('integration_test', True, f'✅ 動作確認済み (DB:{db_records}件, PF:{pf_count}件)', elapsed_ns))
+            if VERBOSE:
+                print(f"✅ 統合動作テスト成功 - 動作確認済み (DB:{db_records}件, PF:{pf_count}件)", file=out)
         else:
-            test_results['integration_test'] = {'status': f'⚠️ 一部失敗 (DB:{db_records}, PF:{pf_count})', 'time': f'{elapsed:.2f}s'}
-            print(f"⚠️ 統合動作テスト - 一部失敗 (DB:{db_records}, PF:{pf_count})")
+            test_results.append(('integration_test', False, f'⚠️ 一部失敗 (DB:{db_records}, PF:{pf_count})', elapsed_ns))
+            print(f"⚠️ 統合動作テスト - 一部失敗 (DB:{db_records}, PF:{pf_count})", file=out)
             
     except Exception as e:
-        test_results['integration_test'] = {'status': f'❌ エラー: {e}', 'time': 'N/A'}
-        print(f"❌ 統合動作テストエラー: {e}")
+        test_results.append(('integration_test', False, f'❌ エラー: {e}', None))
+        print(f"❌ 統合動作テストエラー: {e}", file=out)
     
     # テスト5: ページファイル構文チェック
-    print("\n📋 テスト5: ページファイル構文チェック")
-    print("-" * 50)
+    if VERBOSE:
+        print("\n📋 テスト5: ページファイル構文チェック", file=out)
+        print("-" * 50, file=out)
+    _flush(out)
     try:
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
-        import ast
-        pages_to_check = [
-            "pages/01_県総_採用試験.py",
-            "pages/02_小論文.py", 
-            "pages/03_面接.py",
-            "pages/05_英語読解.py"
-        ]
+        # 各ファイルは独立しているため並列にチェック
+        with ThreadPoolExecutor(max_workers=len(PAGES_TO_CHECK)) as executor:
+            check_results = list(executor.map(_check_page_syntax, PAGES_TO_CHECK))
         
         syntax_success = 0
-        for page_file in pages_to_check:
-            try:
-                with open(page_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                ast.parse(content)
+        for page_file, result, error in check_results:
+            if result == 'ok':
                 syntax_success += 1
-                print(f"✅ {page_file}")
-            except SyntaxError as e:
-                print(f"❌ {page_file}: 構文エラー ({e})")
-            except Exception as e:
-                print(f"⚠️ {page_file}: その他エラー ({e})")
+                if VERBOSE:
+                    print(f"✅ {page_file}", file=out)
+            elif result == 'syntax_error':
+                print(f"❌ {page_file}: 構文エラー ({error})", file=out)
+            else:
+                print(f"⚠️ {page_file}: その他エラー ({error})", file=out)
         
-        elapsed = time.time() - start_time
+        elapsed_ns = time.perf_counter_ns() - start_ns
         
-        if syntax_success == len(pages_to_check):
-            test_results['syntax_test'] = {'status': f'✅ 成功 ({syntax_success}/{len(pages_to_check)})', 'time': f'{elapsed:.2f}s'}
-            print(f"✅ ページファイル構文チェック成功 ({syntax_success}/{len(pages_to_check)})")
+        if syntax_success == len(PAGES_TO_CHECK):
+            test_results.append(('syntax_test', True, f'✅ 成功 ({syntax_success}/{len(PAGES_TO_CHECK)})', elapsed_ns))
+            if VERBOSE:
+                print(f"✅ ページファイル構文チェック成功 ({syntax_success}/{len(PAGES_TO_CHECK)})", file=out)
         else:
-            test_results['syntax_test'] = {'status': f'⚠️ 部分成功 ({syntax_success}/{len(pages_to_check)})', 'time': f'{elapsed:.2f}s'}
-            print(f"⚠️ ページファイル構文チェック部分成功 ({syntax_success}/{len(pages_to_check)})")
+            test_results.append(('syntax_test', False, f'⚠️ 部分成功 ({syntax_success}/{len(PAGES_TO_CHECK)})', elapsed_ns))
+            print(f"⚠️ ページファイル構文チェック部分成功 ({syntax_success}/{len(PAGES_TO_CHECK)})", file=out)
             
     except Exception as e:
-        test_results['syntax_test'] = {'status': f'❌ エラー: {e}', 'time': 'N/A'}
-        print(f"❌ ページファイル構文チェックエラー: {e}")
+        test_results.append(('syntax_test', False, f'❌ エラー: {e}', None))
+        print(f"❌ ページファイル構文チェックエラー: {e}", file=out)
     
     # 結果サマリー
-    print("\n" + "=" * 80)
-    print("🏆 テスト結果サマリー")
-    print("=" * 80)
+    print("\n" + "=" * 80, file=out)
+    print("🏆 テスト結果サマリー", file=out)
+    print("=" * 80, file=out)
     
-    test_names = {
-        'import_test': '1. 基本インポートテスト',
-        'adapter_test': '2. DatabaseAdapter新機能テスト',
-        'paper_finder_test': '3. paper_finder履歴機能テスト',
-        'integration_test': '4. 統合動作テスト',
-        'syntax_test': '5. ページファイル構文チェック'
-    }
+    for test_key, _, status, elapsed_ns in test_results:
+        time_taken = f'{elapsed_ns / 1e9:.2f}s' if elapsed_ns is not None else 'N/A'
+        print(f"{TEST_NAMES[test_key]:<40} | {status:<30} | {time_taken}", file=out)
     
-    success_count = 0
-    for test_key, test_name in test_names.items():
-        result = test_results.get(test_key, {'status': '❌ 未実行', 'time': 'N/A'})
-        status = result['status']
-        time_taken = result['time']
-        
-        print(f"{test_name:<40} | {status:<30} | {time_taken}")
-        
-        if '✅' in status:
-            success_count += 1
+    success_count = sum(ok for _, ok, _, _ in test_results)
     
-    print("-" * 80)
-    print(f"総合結果: {success_count}/{len(test_names)} テスト成功")
+    print("-" * 80, file=out)
+    print(f"総合結果: {success_count}/{len(TEST_NAMES)} テスト成功", file=out)
     
-    if success_count == len(test_names):
-        print("🎉 全テスト成功！ 新DB対応リファクタリングは完璧に動作しています！")
-    elif success_count >= len(test_names) * 0.8:
-        print("✅ 大部分のテストが成功！ 新DB対応リファクタリングは良好に動作しています。")
+    if success_count == len(TEST_NAMES):
+        print("🎉 全テスト成功！ 新DB対応リファクタリングは完璧に動作しています！", file=out)
+    elif success_count >= len(TEST_NAMES) * 0.8:
+        print("✅ 大部分のテストが成功！ 新DB対応リファクタリングは良好に動作しています。", file=out)
     else:
-        print("⚠️ 一部のテストが失敗しています。詳細を確認してください。")
+        print("⚠️ 一部のテストが失敗しています。詳細を確認してください。", file=out)
     
-    print(f"実行完了時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("=" * 80)
+    print(f"実行完了時刻: {datetime.now():%Y-%m-%d %H:%M:%S}", file=out)
+    print("=" * 80, file=out)
     
     return test_results
 
 if __name__ == "__main__":
+    # 絵文字・日本語の出力をUTF-8で統一（Windowsのコンソールでも1回の設定で済ませる）
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(encoding='utf-8')
+    
     try:
         results = run_test_suite()
     except Exception as e:
@@ -4,12 +4,31 @@
 
 import sys
 import os
+import functools
 
 # プロジェクトルートをPythonのパスに追加
 project_root = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(project_root)
 sys.path.insert(0, parent_dir)
 
+# 練習タイプマッピングの確認対象
+PRACTICE_TYPES_TO_CHECK = (
+    "keyword_generation_english",
+    "keyword_generation_free",
+    "keyword_generation_adoption",
+    "paper_search_english",
+    "prefecture_adoption",
+    "essay_practice",
+    "interview_prep",
+    "english_reading_practice",
+)
+
+@functools.cache
+def _adapter():
+    """DatabaseAdapterV3を1回だけ生成して共有"""
+    from modules.database_adapter_v3 import DatabaseAdapterV3
+    return DatabaseAdapterV3()
+
 print("=" * 50)
 print("新DB対応リファクタリング - シンプルテスト")
 print("=" * 50)
@@ -22,7 +41,7 @@ try:
     from modules.database_adapter_v3 import DatabaseAdapterV3
     print("✅ DatabaseAdapterV3 インポート成功")
     
-    db = DatabaseAdapterV3()
+    db = _adapter()
     print("✅ DatabaseAdapterV3 インスタンス化成功")
     
     # 新機能の存在確認
@@ -42,11 +61,12 @@ except Exception as e:
 # 2. DatabaseManagerV2のテスト
 print("\n2. DatabaseManagerV2のテスト")
 try:
-    from modules.database_v3 import DatabaseManagerV3
+    from modules.database_v3 import db_manager_v3
     print("✅ DatabaseManagerV2 インポート成功")
     
-    db_v2 = DatabaseManagerV3()
-    print("✅ DatabaseManagerV2 インスタンス化成功")
+    # モジュールで生成済みのインスタンスを使う（Supabaseクライアントを再生成しない）
+    db_v2 = db_manager_v3
+    print("✅ DatabaseManagerV2 インスタンス取得成功")
     
     if hasattr(db_v2, 'delete_user_history_by_type'):
         print("✅ delete_user_history_by_type メソッド存在")
@@ -83,26 +103,13 @@ except Exception as e:
 # 5. 練習タイプマッピングのテスト
 print("\n5. 練習タイプマッピングのテスト")
 try:
-    from modules.database_adapter_v3 import DatabaseAdapterV3
-    db = DatabaseAdapterV3()
-    
-    # 練習タイプマッピングの確認
-    test_types = [
-        "keyword_generation_english",
-        "keyword_generation_free", 
-        "keyword_generation_adoption",
-        "paper_search_english",
-        "prefecture_adoption",
-        "essay_practice",
-        "interview_prep",
-        "english_reading_practice"
-    ]
+    db = _adapter()
     
     if hasattr(db, '_get_exercise_type_id_by_new_key'):
         print("✅ 練習タイプマッピング関数存在")
         
         # サンプルマッピングテスト
-        for practice_type in test_types[:3]:  # 最初の3つだけテスト
+        for practice_type in PRACTICE_TYPES_TO_CHECK[:3]:  # 最初の3つだけテスト
             try:
                 result = db._get_exercise_type_id_by_new_key(practice_type)
                 if result:
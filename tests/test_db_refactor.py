@@ -0,0 +1,110 @@
+"""
+新DB対応リファクタリング - 統合テスト（pytest版）
+
+run_all_tests.py の5つのテスト項目を独立したテストとして定義します。
+pytest-xdist を使うと各テストを複数プロセスで並列に実行できます。
+
+    uv run --with pytest --with pytest-xdist pytest -n auto --dist=loadgroup tests/
+"""
+
+from pathlib import Path
+
+import pytest
+
+# ページファイルの位置を求めるためのプロジェクトルート（sys.pathの設定はconftest.pyで行う）
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+PAGES_TO_CHECK = (
+    "pages/01_県総_採用試験.py",
+    "pages/02_小論文.py",
+    "pages/03_面接.py",
+    "pages/05_英語読解.py",
+)
+
+# 新DBキー -> 解決される演習タイプ名（exercise_typesの初期データに存在するもの）
+PRACTICE_TYPE_NAMES = (
+    ("keyword_generation_paper", "keyword_generation_english"),
+    ("keyword_generation_freeform", "keyword_generation_free"),
+    ("keyword_generation_general", "keyword_generation_english"),
+    ("paper_search", "paper_search_english"),
+    ("essay_practice", "essay_practice"),
+    ("english_reading_standard", "english_reading_practice"),
+    ("english_reading_letter_style", "english_reading_practice"),
+    ("english_reading_comment_style", "english_reading_practice"),
+    ("free_writing", "free_writing_practice"),
+)
+
+# DBの内容を変更するテストは同じワーカーで直列に実行する（--dist=loadgroup）
+serial = pytest.mark.xdist_group(name="serial")
+
+
+def test_import(db_adapter, db_manager):
+    """テスト1: 基本インポートと新機能メソッドの存在確認"""
+    from modules.paper_finder import get_keyword_history, clear_keyword_history
+    from modules.session_manager import StreamlitSessionManager
+
+    assert hasattr(db_adapter, 'get_practice_history_by_type')
+    assert hasattr(db_adapter, 'delete_practice_history_by_type')
+    assert hasattr(db_manager, 'delete_user_history_by_type')
+
+
+@serial
+def test_adapter(db_adapter):
+    """テスト2: DatabaseAdapterの履歴取得・保存"""
+    from datetime import datetime
+
+    history = db_adapter.get_user_history()
+    assert isinstance(history, list)
+
+    result = db_adapter.save_practice_history({
+        "type": "test",
+        "content": "テストデータ",
+        "timestamp": datetime.now().isoformat()
+    })
+    assert isinstance(result, bool)
+
+
+@serial
+def test_paper_finder():
+    """テスト3: paper_finderの履歴取得・削除"""
+    from modules.paper_finder import get_keyword_history, clear_keyword_history
+
+    assert isinstance(get_keyword_history(), list)
+    assert isinstance(clear_keyword_history(), bool)
+    assert isinstance(get_keyword_history(), list)
+
+
+def test_integration(db_adapter):
+    """テスト4: DatabaseAdapterとpaper_finderの統合動作"""
+    from modules.paper_finder import get_keyword_history
+
+    db_records = db_adapter.count_user_history()
+    pf_records = get_keyword_history()
+
+    assert db_records >= 0
+    assert isinstance(pf_records, list)
+
+
+@pytest.mark.parametrize("page_file", PAGES_TO_CHECK)
+def test_syntax(page_file):
+    """テスト5: ページファイルの構文チェック"""
+    import ast
+
+    source = (PROJECT_ROOT / page_file).read_bytes()
+    compile(source, page_file, 'exec', flags=ast.PyCF_ONLY_AST)
+
+
+@pytest.mark.parametrize("practice_type,type_name", PRACTICE_TYPE_NAMES)
+def test_practice_type_id(db_adapter, practice_type, type_name):
+    """練習タイプごとのマッピング確認（IDはDB側で採番されるため演習タイプ名で確認）"""
+    if not db_adapter.is_available():
+        pytest.skip("データベースに接続できません")
+
+    exercise_type_id = db_adapter._get_exercise_type_id_by_new_key(practice_type)
+    assert exercise_type_id is not None
+
+    type_names = {
+        exercise_type.exercise_type_id: exercise_type.type_name
+        for exercise_type in db_adapter.v3_manager.get_exercise_types()
+    }
+    assert type_names[exercise_type_id] == type_name
@@ -5,12 +5,18 @@ Phase 1 & 2 実装のインポートテスト
 新DB対応で修正したモジュールが正常にインポートできるかをテストします。
 """
 
+import argparse
+import io
 import unittest
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 # プロジェクトルートをパスに追加
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+PAGES_DIR = os.path.join(PROJECT_ROOT, "pages")
 
 class TestImports(unittest.TestCase):
     """基本的なインポートテスト"""
@@ -42,6 +48,8 @@ class TestImports(unittest.TestCase):
                        "get_practice_history_by_type メソッド存在")
         self.assertTrue(hasattr(db, 'delete_practice_history_by_type'), 
                        "delete_practice_history_by_type メソッド存在")
+        self.assertTrue(hasattr(db, 'count_user_history'), 
+                       "count_user_history メソッド存在")
     
     def test_database_v3_import(self):
         """DatabaseManagerV3のインポートテスト"""
@@ -53,8 +61,7 @@ class TestImports(unittest.TestCase):
 
     def test_database_v3_new_method(self):
         """DatabaseManagerV3の新機能メソッド存在確認"""
-        from modules.database_v3 import DatabaseManagerV3
-        db_v3 = DatabaseManagerV3()
+        from modules.database_v3 import db_manager_v3 as db_v3
         
         self.assertTrue(hasattr(db_v3, 'delete_user_history_by_type'), 
                        "delete_user_history_by_type メソッド存在")
@@ -76,7 +83,7 @@ class TestImports(unittest.TestCase):
             self.fail(f"StreamlitSessionManager インポートエラー: {e}")
     
     def test_page_imports(self):
-        """修正したページファイルのインポートテスト（構文エラーチェック）"""
+        """修正したページファイルの存在確認（pages/ を1回だけ走査して確認）"""
         pages_to_test = [
             "pages.02_小論文",
             "pages.03_面接", 
@@ -84,37 +91,64 @@ class TestImports(unittest.TestCase):
             "pages.01_県総_採用試験"
         ]
         
+        with os.scandir(PAGES_DIR) as entries:
+            existing = {entry.name for entry in entries if entry.is_file()}
+        
         for page_module in pages_to_test:
             with self.subTest(page=page_module):
-                try:
-                    # 構文エラーがないかチェック（実際のstreamlitの実行はしない）
-                    import importlib.util
-                    file_path = page_module.replace(".", "/") + ".py"
-                    spec = importlib.util.spec_from_file_location(
-                        page_module, file_path
-                    )
-                    if spec and spec.loader:
-                        # ファイルが存在し、構文エラーがないことを確認
-                        self.assertTrue(True, f"{page_module} 構文チェック成功")
-                    else:
-                        self.fail(f"{page_module} ファイルが見つからない")
-                except SyntaxError as e:
-                    self.fail(f"{page_module} 構文エラー: {e}")
-                except Exception as e:
-                    # streamlit関連のエラーは想定内なので成功扱い
-                    if "streamlit" in str(e).lower():
-                        self.assertTrue(True, f"{page_module} 構文チェック成功（streamlitエラーは想定内）")
-                    else:
-                        self.fail(f"{page_module} 予期しないエラー: {e}")
+                file_name = page_module.split(".", 1)[1] + ".py"
+                self.assertIn(file_name, existing, f"{page_module} ファイルが見つからない")
+
+def _run_single_test(test_id):
+    """1件のテストを実行し (成否, 実行件数, 出力) を返す（ワーカープロセス用）"""
+    stream = io.StringIO()
+    suite = unittest.defaultTestLoader.loadTestsFromName(test_id)
+    result = unittest.TextTestRunner(stream=stream, verbosity=2, buffer=True).run(suite)
+    return result.wasSuccessful(), result.testsRun, stream.getvalue()
+
+def _iter_test_ids(suite):
+    """TestSuiteを展開してテストIDを列挙"""
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from _iter_test_ids(test)
+        else:
+            yield test.id()
 
 def main():
     """テスト実行関数"""
+    parser = argparse.ArgumentParser(description="新DB対応リファクタリング - インポートテスト")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="テストごとの名前と結果を表示する")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="並列実行するプロセス数（既定: 1 = 直列実行）")
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("新DB対応リファクタリング - インポートテスト")
     print("=" * 60)
     
-    # テスト実行
-    unittest.main(verbosity=2, exit=False)
+    suite = unittest.defaultTestLoader.loadTestsFromModule(sys.modules[__name__])
+    
+    if args.jobs <= 1:
+        # テスト実行（通常は簡易表示、テスト中の出力は失敗時のみ表示）
+        runner = unittest.TextTestRunner(verbosity=2 if args.verbose else 1, buffer=True)
+        return 0 if runner.run(suite).wasSuccessful() else 1
+    
+    # テストメソッドごとに別プロセスで実行（DB接続待ちを並列化）
+    test_ids = list(_iter_test_ids(suite))
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        results = list(executor.map(_run_single_test, test_ids))
+    
+    failed = [output for ok, _, output in results if not ok]
+    if args.verbose:
+        print("".join(output for _, _, output in results))
+    else:
+        print("".join(failed))
+    
+    tests_run = sum(count for _, count, _ in results)
+    print(f"Ran {tests_run} tests with {args.jobs} processes: "
+          f"{'OK' if not failed else f'FAILED ({len(failed)} failed)'}")
+    return 0 if not failed else 1
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
@@ -4,228 +4,124 @@
 修正後に各ページからの呼び出しが適切に区別されるかをテストします。
 """
 
-import sys
 import os
+import re
+import functools
+import inspect
+import unittest
+from types import MappingProxyType
 
-# プロジェクトルートをPythonのパスに追加
-project_root = os.path.dirname(os.path.abspath(__file__))
-parent_dir = os.path.dirname(project_root)
-sys.path.insert(0, parent_dir)
+# ページファイルの位置の基準となるプロジェクトルート
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-def test_paper_search_purpose_distinction():
-    """論文検索のページ別区別テスト"""
-    
-    print("=" * 60)
-    print("論文検索のページ別区別テスト")
-    print("=" * 60)
-    
-    try:
-        from modules.paper_finder import find_medical_paper
-        print("✅ find_medical_paper インポート成功")
-        
-        # 1. 県総採用試験からの呼び出しテスト
-        print("\n1. 県総採用試験からの呼び出しテスト")
-        try:
-            # 実際にAPIを呼び出さずに、パラメータチェックのみ
-            import inspect
-            sig = inspect.signature(find_medical_paper)
-            params = list(sig.parameters.keys())
-            
-            if 'purpose' in params:
-                print("✅ purposeパラメータが存在")
-                print(f"✅ 関数シグネチャ: {sig}")
-                
-                # モック的なテスト（実際のAPI呼び出しは避ける）
-                print("✅ medical_exam目的でのパラメータ渡しは可能")
-            else:
-                print("❌ purposeパラメータが見つからない")
-                
-        except Exception as e:
-            print(f"❌ 県総採用試験テストエラー: {e}")
-        
-        # 2. 英語読解からの呼び出しテスト  
-        print("\n2. 英語読解からの呼び出しテスト")
-        try:
-            # 同様にパラメータチェック
-            if 'purpose' in params:
-                print("✅ english_reading目的でのパラメータ渡しは可能")
-            else:
-                print("❌ purposeパラメータが見つからない")
-                
-        except Exception as e:
-            print(f"❌ 英語読解テストエラー: {e}")
-        
-        # 3. purpose-practice_typeマッピングテスト
-        print("\n3. purpose-practice_typeマッピングテスト")
-        
-        test_mappings = {
-            "medical_exam": "medical_exam_comprehensive",
-            "english_reading": "english_reading_standard",
-            "general": "paper_search"
-        }
-        
-        for purpose, expected_type in test_mappings.items():
-            print(f"✅ {purpose} -> {expected_type}")
+# 論文検索: purpose -> practice_type
+PAPER_SEARCH_PURPOSE_TYPES = MappingProxyType({
+    "medical_exam": "medical_exam_comprehensive",
+    "english_reading": "english_reading_standard",
+    "general": "paper_search"
+})
+
+# キーワード生成: purpose -> practice_type
+KEYWORD_PURPOSE_TYPES = MappingProxyType({
+    "paper_search": "keyword_generation_english",
+    "free_writing": "keyword_generation_free",
+    "general": "keyword_generation_english"
+})
+
+# ページ別に区別して保存される練習タイプ
+NEW_PRACTICE_TYPES = (
+    "prefecture_adoption",         # 県総採用試験
+    "english_reading_practice",    # 英語読解
+    "keyword_generation_english",  # 論文検索用キーワード
+    "keyword_generation_free",     # 自由記述用キーワード
+    "keyword_generation_adoption"  # 採用試験用キーワード
+)
+
+# find_medical_paper(keywords) / find_medical_paper(keywords, "purpose") の呼び出し（group(1)がpurpose）
+FIND_MEDICAL_PAPER_CALL = re.compile(rb'find_medical_paper\(keywords(?:,\s*"([^"]+)")?\)')
+
+@functools.lru_cache(maxsize=None)
+def _signature(fn):
+    """関数シグネチャを1回だけ解析して共有"""
+    return inspect.signature(fn)
+
+def _params(fn):
+    """関数の引数名のタプル"""
+    return tuple(_signature(fn).parameters)
+
+def setUpModule():
+    """テスト対象の関数とDatabaseAdapterV3をモジュール内で1回だけ用意"""
+    global find_medical_paper, generate_medical_keywords, db, DB_AVAILABLE
+    from modules.paper_finder import find_medical_paper, generate_medical_keywords
+    from modules.database_adapter_v3 import DatabaseAdapterV3
+    db = DatabaseAdapterV3()
+    # 接続状態は1回だけ確認（DB停止中に接続待ちを繰り返さない）
+    DB_AVAILABLE = db.is_available()
+
+class TestPurposeDistinction(unittest.TestCase):
+    """論文検索・キーワード生成のページ別区別テスト"""
+
+    def test_paper_search_purpose_distinction(self):
+        """論文検索のページ別区別テスト"""
         
-        print(f"\n✅ 論文検索のページ別区別テスト完了")
+        # 1. 県総採用試験・英語読解からの呼び出し（実際にAPIを呼び出さずに、パラメータチェックのみ）
+        self.assertIn('purpose', _params(find_medical_paper),
+                      f"purposeパラメータが見つからない: {_signature(find_medical_paper)}")
         
-    except Exception as e:
-        print(f"❌ 論文検索区別テスト全体エラー: {e}")
+        # 2. purpose-practice_typeマッピング
+        print("\n".join(f"✅ {purpose} -> {expected_type}"
+                        for purpose, expected_type in PAPER_SEARCH_PURPOSE_TYPES.items()))
 
-def test_keyword_generation_purpose_distinction():
-    """キーワード生成のページ別区別テスト"""
-    
-    print("\n" + "=" * 60)
-    print("キーワード生成のページ別区別テスト")
-    print("=" * 60)
-    
-    try:
-        from modules.paper_finder import generate_medical_keywords
-        print("✅ generate_medical_keywords インポート成功")
+    def test_keyword_generation_purpose_distinction(self):
+        """キーワード生成のページ別区別テスト"""
         
         # 1. 関数シグネチャ確認
-        print("\n1. 関数シグネチャ確認")
-        try:
-            import inspect
-            sig = inspect.signature(generate_medical_keywords)
-            params = list(sig.parameters.keys())
-            
-            print(f"✅ 関数シグネチャ: {sig}")
-            
-            if 'purpose' in params:
-                print("✅ purposeパラメータが存在")
-            else:
-                print("❌ purposeパラメータが見つからない")
-                
-        except Exception as e:
-            print(f"❌ シグネチャ確認エラー: {e}")
-        
-        # 2. purpose-practice_typeマッピングテスト
-        print("\n2. キーワード生成のpurpose-practice_typeマッピング")
-        
-        test_mappings = {
-            "paper_search": "keyword_generation_english",
-            "free_writing": "keyword_generation_free",
-            "general": "keyword_generation_english"
-        }
+        self.assertIn('purpose', _params(generate_medical_keywords),
+                      f"purposeパラメータが見つからない: {_signature(generate_medical_keywords)}")
         
-        for purpose, expected_type in test_mappings.items():
-            print(f"✅ {purpose} -> {expected_type}")
+        # 2. purpose-practice_typeマッピング
+        print("\n".join(f"✅ {purpose} -> {expected_type}"
+                        for purpose, expected_type in KEYWORD_PURPOSE_TYPES.items()))
+
+    def test_page_call_integration(self):
+        """各ページでの呼び出し統合テスト"""
         
-        print(f"\n✅ キーワード生成のページ別区別テスト完了")
+        # 1. ページファイルの呼び出し箇所確認
+        test_files = [
+            ("pages/01_県総_採用試験.py", "medical_exam"),
+            ("pages/05_英語読解.py", "english_reading")
+        ]
         
-    except Exception as e:
-        print(f"❌ キーワード生成区別テスト全体エラー: {e}")
-
-def test_page_call_integration():
-    """各ページでの呼び出し統合テスト"""
-    
-    print("\n" + "=" * 60)
-    print("各ページでの呼び出し統合テスト")
-    print("=" * 60)
-    
-    # 1. ページファイルの呼び出し箇所確認
-    print("\n1. ページファイルの呼び出し箇所確認")
-    
-    test_files = [
-        ("pages/01_県総_採用試験.py", "medical_exam"),
-        ("pages/05_英語読解.py", "english_reading")
-    ]
-    
-    for file_path, expected_purpose in test_files:
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # find_medical_paperの呼び出し検索
-            if f'find_medical_paper(keywords, "{expected_purpose}")' in content:
-                print(f"✅ {file_path}: 正しいpurpose ({expected_purpose}) で呼び出し")
-            elif 'find_medical_paper(keywords)' in content:
-                print(f"⚠️ {file_path}: 古い形式での呼び出し（purpose指定なし）")
-            elif 'find_medical_paper' in content:
-                print(f"⚠️ {file_path}: find_medical_paperは使用されているがpurpose不明")
-            else:
-                print(f"ℹ️ {file_path}: find_medical_paperは使用されていない")
+        for file_path, expected_purpose in test_files:
+            with self.subTest(page=file_path):
+                # 確認するのはASCIIの呼び出し部分だけなので、デコードせずバイト列のまま走査
+                with open(os.path.join(PROJECT_ROOT, file_path), 'rb') as f:
+                    content = f.read()
+                
+                # find_medical_paperの呼び出しを1回の走査で検索（purpose指定なしはNone）
+                purposes = {match.group(1) for match in FIND_MEDICAL_PAPER_CALL.finditer(content)}
                 
-        except Exception as e:
-            print(f"❌ {file_path}: 確認エラー ({e})")
-    
-    # 2. 履歴保存の区別確認
-    print("\n2. 履歴保存の区別確認")
-    
-    expected_practice_types = [
-        "prefecture_adoption",         # 県総採用試験
-        "english_reading_practice",    # 英語読解
-        "keyword_generation_english",  # 論文検索用キーワード
-        "keyword_generation_free",     # 自由記述用キーワード
-        "keyword_generation_adoption"  # 採用試験用キーワード
-    ]
-    
-    for practice_type in expected_practice_types:
-        print(f"✅ 練習タイプ対応予定: {practice_type}")
-    
-    print(f"\n✅ 各ページでの呼び出し統合テスト完了")
+                self.assertIn(expected_purpose.encode(), purposes,
+                              f"{file_path}: find_medical_paperが purpose={expected_purpose} で呼ばれていない")
+                # purpose指定ありの呼び出しがあれば合格とし、指定なしの呼び出しは警告として表示する
+                if None in purposes:
+                    print(f"⚠️ {file_path}: 古い形式での呼び出し（purpose指定なし）も残っています")
+        
+        # 2. 履歴保存の区別確認
+        print("\n".join(f"✅ 練習タイプ対応予定: {practice_type}" for practice_type in NEW_PRACTICE_TYPES))
 
-def test_database_adapter_compatibility():
-    """DatabaseAdapterとの互換性テスト"""
-    
-    print("\n" + "=" * 60)
-    print("DatabaseAdapterとの互換性テスト")
-    print("=" * 60)
-    
-    try:
-        from modules.database_adapter_v3 import DatabaseAdapterV3
-        
-        db = DatabaseAdapterV3()
-        print("✅ DatabaseAdapter インスタンス化成功")
+    def test_database_adapter_compatibility(self):
+        """DatabaseAdapterとの互換性テスト"""
+        if not DB_AVAILABLE:
+            self.skipTest("データベースに接続できません")
         
         # 新しい練習タイプのマッピング確認
-        new_practice_types = [
-            "prefecture_adoption",
-            "english_reading_practice",
-            "keyword_generation_english",
-            "keyword_generation_free",
-            "keyword_generation_adoption"
-        ]
-        
-        print("\n新しい練習タイプのマッピング確認:")
-        mapping_success = 0
-        for practice_type in new_practice_types:
-            try:
-                result = db._get_practice_type_id_by_new_key(practice_type)
-                if result and isinstance(result, int) and result > 0:
-                    print(f"✅ {practice_type} -> ID: {result}")
-                    mapping_success += 1
-                else:
-                    print(f"❌ {practice_type} -> 無効なID: {result}")
-            except Exception as e:
-                print(f"❌ {practice_type} -> エラー: {e}")
-        
-        print(f"\n📊 マッピング成功率: {mapping_success}/{len(new_practice_types)}")
+        for practice_type in NEW_PRACTICE_TYPES:
+            with self.subTest(practice_type=practice_type):
+                result = db._get_exercise_type_id_by_new_key(practice_type)
+                self.assertIsInstance(result, int)
+                self.assertGreater(result, 0)
         
-        if mapping_success == len(new_practice_types):
-            print("🎉 全ての新しい練習タイプが正常にマッピングされています！")
-        else:
-            print("⚠️ 一部の練習タイプでマッピングエラーがあります")
-            
         # 新スキーマの履歴取得テスト
         records = db.get_user_history()
-        assert isinstance(records, list)
-        
-        print(f"\n✅ DatabaseAdapterとの互換性テスト完了")
-        
-    except Exception as e:
-        print(f"❌ DatabaseAdapter互換性テスト全体エラー: {e}")
-
-if __name__ == "__main__":
-    print("🔍 修正後のページ別区別テスト")
-    print("=" * 80)
-    
-    test_paper_search_purpose_distinction()
-    test_keyword_generation_purpose_distinction()
-    test_page_call_integration()
-    test_database_adapter_compatibility()
-    
-    print("\n" + "=" * 80)
-    print("✅ ページ別区別テスト完了")
-    print("=" * 80) 
\ No newline at end of file
+        self.assertIsInstance(records, list)